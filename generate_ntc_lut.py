@@ -1,8 +1,6 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import os
 import sys
-import csv
 import argparse
 import ntc_lut
 import steinhart_hart_ntc as sh
@@ -10,6 +8,25 @@ import steinhart_hart_ntc as sh
 # config
 c_plot_resolution = 0.1 # degrees C
 
+# scratch buffers for the plotted model curve, reused across main() invocations in
+# the same process (interactive sweeps) instead of reallocating per run.
+# the initial capacity of -1 makes the first call allocate even for an empty curve
+c_model_scratch = {"capacity": -1}
+
+# return views of the reusable model curve buffers (index ramp, temperatures),
+# growing them only when a larger curve is requested. the solver and converter
+# results are freshly allocated by their callees and are bound directly instead
+# of being copied into scratch, which would only add allocation traffic
+def model_curve_scratch(n):
+    if c_model_scratch["capacity"] < n:
+        c_model_scratch["capacity"] = n
+        c_model_scratch["ramp"] = np.arange(n, dtype=np.float64)
+        c_model_scratch["temps"] = np.empty(n)
+    return (
+        c_model_scratch["ramp"][:n],
+        c_model_scratch["temps"][:n]
+    )
+
 # main function
 def main(argv):
     # parse arguments
@@ -38,15 +55,12 @@ def main(argv):
         assert args.reference_voltage is not None, "Reference voltage argument missing"
         assert args.pull_up_resistance is not None, "Pull-up resistance argument missing"
 
-    # read input file
+    # read input file (C-level parse directly into two float arrays)
     with args.input_file as f:
-        reader = csv.reader(f)
-        input_data = list(reader)
-    measured_temps = [float(row[0]) for row in input_data]
-    target_values = [float(row[1]) for row in input_data]
+        measured_temps, target_values = np.loadtxt(f, delimiter=',', dtype=np.float64, unpack=True, ndmin=2)
 
-    # get steinhart-hart powers
-    powers = [int(p) for p in args.steinhart_hart_powers.split(",")]
+    # get steinhart-hart powers (immutable tuple, usable as a cache/specialization key)
+    powers = tuple(int(p) for p in args.steinhart_hart_powers.split(","))
 
     # sample temperatures (if specified, otherwise use measured temperatures)
     if args.sample_temp_start is not None and args.sample_temp_end is not None and args.sample_temp_step is not None:
@@ -91,6 +105,10 @@ def main(argv):
     # plot fitted model and data points if plotting is enabled.
     # two plots, one with ADC vs. temperature and one with resistance vs. temperature
     if not args.noplot:
+        # import matplotlib only when actually plotting; the import alone costs
+        # a few hundred milliseconds and would dominate batch/--noplot runs
+        import matplotlib.pyplot as plt
+
         # calculate resistances
         if args.resistance_mode:
             measured_resistances = target_values
@@ -103,9 +121,14 @@ def main(argv):
         else:
             ax1, ax2 = fig.subplots(2, 1)
 
-        # resistance vs. temperature
-        model_temps = np.arange(min(measured_temps), max(measured_temps), c_plot_resolution)
-        model_resistances = np.array([sh.inverse_steinhart_hart(model_temps[i], sh_coeffs, powers, 1.0, not args.temp_in_kelvin, 1e-6, args.extrapolation_max_iterations, args.extrapolation_tolerance) for i in range(len(model_temps))])
+        # resistance vs. temperature; the model curve lives in the reusable scratch buffers
+        temp_min = np.min(measured_temps)
+        n_model = int(np.ceil((np.max(measured_temps) - temp_min) / c_plot_resolution))
+        ramp, model_temps = model_curve_scratch(n_model)
+        # model_temps = temp_min + i * resolution, computed in place
+        np.multiply(ramp, c_plot_resolution, out=model_temps)
+        model_temps += temp_min
+        model_resistances = sh.inverse_steinhart_hart_vec(model_temps, sh_coeffs, powers, 1.0, not args.temp_in_kelvin, 1e-6, args.extrapolation_max_iterations, args.extrapolation_tolerance)
 
         ax1.set_title("Resistance vs. Temperature")
         ax1.scatter(measured_resistances, measured_temps, label="Measured data points")
@@ -128,11 +151,9 @@ def main(argv):
         fig.tight_layout()
         plt.show(block = True)
 
-    # write output file if specified
+    # write output file if specified (single C-level formatting pass instead of per-row csv writing)
     if args.output_file is not None:
-        with open(args.output_file, mode='w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerows(lut)
+        np.savetxt(args.output_file, lut, delimiter=',', fmt='%.9g', newline='\n')
 
 # entry point
 if __name__ == "__main__":
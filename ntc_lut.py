@@ -8,13 +8,16 @@ def adc_to_resistance(
     reference_voltage,
     pull_up_resistance
 ):
-    # convert to numpy array if not already
-    if type(adc_values) is not np.ndarray:
-        adc_values = np.array(adc_values)
+    # convert to a float array without copying if possible
+    adc_values = np.asarray(adc_values, dtype=np.float64)
+    # volts per adc count
+    scale = reference_voltage / ((1 << adc_resolution) - 1)
     # convert adc values to voltages
-    voltages = adc_values * reference_voltage / (2 ** adc_resolution - 1)
-    # convert voltages to resistances
-    resistances = voltages * pull_up_resistance / (reference_voltage - voltages)
+    voltages = adc_values * scale
+    # convert voltages to resistances, reusing the buffers instead of allocating temporaries
+    resistances = voltages * pull_up_resistance
+    np.subtract(reference_voltage, voltages, out=voltages)
+    np.divide(resistances, voltages, out=resistances)
     # return the resistances
     return resistances
 
@@ -25,18 +28,48 @@ def resistance_to_adc(
     reference_voltage,
     pull_up_resistance
 ):
-    # convert to numpy array if not already
-    if type(resistances) is not np.ndarray:
-        resistances = np.array(resistances)
-    # convert resistances to voltages
-    voltages = resistances * reference_voltage / (pull_up_resistance + resistances)
-    # convert voltages to adc values
-    adc_values = (voltages / reference_voltage) * (2 ** adc_resolution - 1)
-    # round to nearest integer
-    adc_values = np.round(adc_values)
+    # convert to a float array without copying if possible
+    resistances = np.asarray(resistances, dtype=np.float64)
+    # adc counts per unit of voltage divider ratio
+    max_count = (1 << adc_resolution) - 1
+    # convert resistances to adc values (the reference voltage cancels out of the divider ratio),
+    # reusing one buffer instead of allocating temporaries
+    adc_values = resistances * max_count
+    np.divide(adc_values, pull_up_resistance + resistances, out=adc_values)
+    # round to nearest integer in place
+    np.rint(adc_values, out=adc_values)
     # return the adc values
     return adc_values
 
+# number of resistance samples used for the forward-evaluated interpolation grid
+c_forward_grid_size = 4096
+
+# solve for the resistances of a set of sample temperatures by forward evaluation:
+# the model's natural forward variable is R, so instead of inverting it once per
+# temperature, sample the resistance axis densely, evaluate the cheap forward
+# model on the grid, interpolate T(R) -> R(T), and polish the result with a
+# warm-started newton solve that converges in one or two iterations
+def sample_temps_to_resistances(
+    sample_temps,
+    coefficients,
+    terms = (0, 1, 3),
+    max_iterations = 1000,
+    tolerance = 1e-6
+):
+    # convert to a float array if not already
+    sample_temps = np.asarray(sample_temps, dtype=np.float64)
+    # bracket the resistance range with the two extreme temperatures (the only
+    # cold inverse solves needed), widened so the interpolation never clips
+    r_hot = sh.inverse_steinhart_hart(np.max(sample_temps), coefficients, terms, 1.0, True, 1e-6, max_iterations, tolerance)
+    r_cold = sh.inverse_steinhart_hart(np.min(sample_temps), coefficients, terms, 1.0, True, 1e-6, max_iterations, tolerance)
+    r_grid = np.geomspace(r_hot * 0.5, r_cold * 2.0, c_forward_grid_size)
+    # forward model temperatures on the grid (monotone decreasing in R for an NTC)
+    t_grid = sh.steinhart_hart(r_grid, coefficients, terms, True)
+    # interpolate log-resistance over temperature (reversed so temperatures ascend)
+    guess = np.exp(np.interp(sample_temps, t_grid[::-1], np.log(r_grid[::-1])))
+    # polish the interpolated seeds to the requested tolerance
+    return sh.inverse_steinhart_hart_vec(sample_temps, coefficients, terms, guess, True, 1e-6, max_iterations, tolerance)
+
 # given a set of steinhart-hart coeffients, return a LUT of ADC value to temperature pairs
 def steinhart_hart_to_adc_lut(
     sample_temps,
@@ -44,7 +77,7 @@ def steinhart_hart_to_adc_lut(
     reference_voltage,
     pull_up_resistance,
     coefficients,
-    terms = [0, 1, 3],
+    terms = (0, 1, 3),
     temp_in_celsius = True,
     max_iterations = 1000,
     tolerance = 1e-6
@@ -60,7 +93,7 @@ def steinhart_hart_to_adc_lut(
     # assert that the number of sample temperatures is at least 1
     assert len(sample_temps) > 0, "Number of sample temperatures must be at least 1"
     # get resistance values for each sample temperature
-    sample_resistances = np.array([sh.inverse_steinhart_hart(sample_temps[i], coefficients, terms, 1.0, True, 1e-6, max_iterations, tolerance) for i in range(len(sample_temps))])    
+    sample_resistances = sample_temps_to_resistances(sample_temps, coefficients, terms, max_iterations, tolerance)
     # convert sample resistances to ADC values
     sample_adc_values = resistance_to_adc(sample_resistances, adc_resolution, reference_voltage, pull_up_resistance)
     # return the LUT
@@ -70,7 +103,7 @@ def steinhart_hart_to_adc_lut(
 def steinhart_hart_to_resistance_lut(
     sample_temps,
     coefficients,
-    terms = [0, 1, 3],
+    terms = (0, 1, 3),
     temp_in_celsius = True,
     max_iterations = 1000,
     tolerance = 1e-6
@@ -80,7 +113,7 @@ def steinhart_hart_to_resistance_lut(
     # assert that the number of sample temperatures is at least 1
     assert len(sample_temps) > 0, "Number of sample temperatures must be at least 1"
     # get resistance values for each sample temperature
-    sample_resistances = np.array([sh.inverse_steinhart_hart(sample_temps[i], coefficients, terms, 1.0, True, 1e-6, max_iterations, tolerance) for i in range(len(sample_temps))])    
+    sample_resistances = sample_temps_to_resistances(sample_temps, coefficients, terms, max_iterations, tolerance)
     # return the LUT
     return np.array([sample_temps, sample_resistances]).T
 
@@ -93,7 +126,7 @@ def fit_adc_lut(
     target_adc_resolution,
     reference_voltage = 3.3,
     pull_up_resistance = 4700.0,
-    steinhart_hart_powers = [0, 1, 3],
+    steinhart_hart_powers = (0, 1, 3),
     temp_in_celsius = True,
     extrapolation_max_iterations = 1000,
     extrapolation_tolerance = 1e-6
@@ -140,7 +173,7 @@ def fit_resistance_lut(
     measured_temps,
     sample_temps,
     resistance_values,
-    steinhart_hart_powers = [0, 1, 3],
+    steinhart_hart_powers = (0, 1, 3),
     temp_in_celsius = True,
     extrapolation_max_iterations = 1000,
     extrapolation_tolerance = 1e-6
@@ -1,70 +1,369 @@
 import numpy as np
 import math
+import functools
+
+# optional numba JIT: when numba is available, the scalar hot kernels below are
+# compiled to machine code (and the batched newton solve runs in parallel);
+# otherwise they run as plain python
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    # no-op decorator stand-in so the kernels below stay plain python functions
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        def wrap(func):
+            return func
+        return wrap
+    prange = range
+
+# scalar steinhart-hart polynomial and derivative kernel. coefficients must be a
+# float64 array and terms a tuple of ints so numba can specialize the loop
+@njit(cache=True, fastmath=True)
+def sh_p_and_dp_scalar(r, coefficients, terms):
+    lnr = math.log(r)
+    inv_r = 1.0 / r
+    p = 0.0
+    dp_dr = 0.0
+    for i in range(len(terms)):
+        k = terms[i]
+        p += coefficients[i] * lnr ** k
+        if k > 0:
+            dp_dr += coefficients[i] * k * lnr ** (k - 1) * inv_r
+    return p, dp_dr
+
+# scalar newton iteration kernel for the inverse steinhart-hart equation
+@njit(cache=True, fastmath=True)
+def newton_inverse_scalar(temperature, coefficients, terms, initial_guess, offset, min_resistance, max_iterations, tolerance):
+    r = initial_guess
+    for i in range(max_iterations):
+        # calculate polynomial and its derivative in one pass
+        p, dp_dr = sh_p_and_dp_scalar(r, coefficients, terms)
+        # calculate f(r) and f'(r)
+        f = 1.0 / p - offset - temperature
+        df_dr = -dp_dr / (p * p)
+        # update r
+        r = max(r - f / df_dr, min_resistance)
+        # check for convergence
+        if abs(f) < tolerance:
+            break
+    return r
+
+# batched newton iteration kernel, one independent scalar solve per lane
+@njit(cache=True, fastmath=True, parallel=True)
+def newton_inverse_batch(temperatures, coefficients, terms, initial_guesses, offset, min_resistance, max_iterations, tolerance):
+    resistances = np.empty_like(temperatures)
+    for i in prange(temperatures.shape[0]):
+        resistances[i] = newton_inverse_scalar(temperatures[i], coefficients, terms, initial_guesses[i], offset, min_resistance, max_iterations, tolerance)
+    return resistances
+
+# block size for the buffered vectorized newton solve; bounds the scratch working
+# set so it stays cache-resident on large temperature sweeps
+NEWTON_BLOCK_SIZE = 65536
+
+# vectorized newton's method over one block of temperatures. the seed array r is
+# refined in place; all per-iteration arithmetic goes through preallocated scratch
+# buffers and out= ufunc calls, so the loop itself allocates nothing. the
+# polynomial and its derivative are evaluated as two matrix-vector products over
+# a stacked power table, so each costs a single BLAS call instead of one ufunc
+# pass per term
+def newton_inverse_buffered(temperatures, coefficients, terms, r, offset, min_resistance, max_iterations, tolerance):
+    n = r.shape[0]
+    n_terms = len(terms)
+    max_term = max(terms)
+    coeffs = np.asarray(coefficients, dtype=np.float64)
+    # derivative coefficients c * k, paired with the shifted power table rows below
+    deriv_coeffs = coeffs * np.array(terms, dtype=np.float64)
+    # scratch buffers, allocated once per block: the power table of log(r), the
+    # stacked basis rows L (lnr^k) and Ld (lnr^(k-1)), and the result vectors
+    lnr_pows = np.empty((max_term + 1, n))
+    lnr_pows[0].fill(1.0)
+    L = np.empty((n_terms, n))
+    Ld = np.zeros((n_terms, n))
+    p = np.empty_like(r)
+    dp = np.empty_like(r)
+    f = np.empty_like(r)
+    tmp = np.empty_like(r)
+    conv = np.empty(r.shape, dtype=bool)
+    # rows belonging to constant basis entries never change; fill them once
+    for j in range(n_terms):
+        if terms[j] == 0:
+            L[j].fill(1.0)
+        if terms[j] == 1:
+            Ld[j].fill(1.0)
+    for i in range(max_iterations):
+        # power table of log(r) by successive multiplication
+        if max_term >= 1:
+            np.log(r, out=lnr_pows[1])
+        for k in range(2, max_term + 1):
+            np.multiply(lnr_pows[k - 1], lnr_pows[1], out=lnr_pows[k])
+        # gather the non-constant basis rows for this iteration
+        for j in range(n_terms):
+            k = terms[j]
+            if k >= 1:
+                np.copyto(L[j], lnr_pows[k])
+            if k >= 2:
+                np.copyto(Ld[j], lnr_pows[k - 1])
+        # p = coeffs . L and dp = (c * k) . Ld, one GEMV each
+        np.dot(coeffs, L, out=p)
+        np.dot(deriv_coeffs, Ld, out=dp)
+        # dp_dr = dp / r
+        dp /= r
+        # f = 1/p - offset - temperatures
+        np.divide(1.0, p, out=f)
+        f -= offset
+        f -= temperatures
+        # newton step: r -= f / (-dp_dr / p^2) = r + f * p^2 / dp_dr
+        np.multiply(f, p, out=tmp)
+        tmp *= p
+        tmp /= dp
+        r += tmp
+        np.maximum(r, min_resistance, out=r)
+        # check for convergence
+        np.abs(f, out=f)
+        np.less(f, tolerance, out=conv)
+        if conv.all():
+            break
+    return r
+
+# natural log that uses math.log for plain scalars (5-10x cheaper than the 0-d
+# ufunc dispatch of np.log) and np.log for arrays
+def sh_log(x):
+    return np.log(x) if isinstance(x, np.ndarray) else math.log(x)
+
+# powers of log(resistance) up to max(terms), built by successive multiplication
+def sh_lnr_powers(resistance, terms):
+    lnr = sh_log(resistance)
+    lnr_pows = [1.0, lnr]
+    for k in range(2, max(terms) + 1):
+        lnr_pows.append(lnr_pows[-1] * lnr)
+    return lnr_pows
 
 # steinhart-hart polynomial terms
 def sh_p(resistance, coefficients, terms):
+    # dispatch to a hand-unrolled kernel when one exists for this basis
+    fast = SH_SPECIALIZATIONS.get(tuple(terms))
+    if fast is not None:
+        return fast[0](resistance, coefficients)
+    # compute log(resistance) and its powers once
+    lnr_pows = sh_lnr_powers(resistance, terms)
     inv_temp = 0.0
-    for (c, p) in zip(coefficients, terms):
-        inv_temp += c * np.log(resistance) ** p
+    for i in range(len(terms)):
+        inv_temp += coefficients[i] * lnr_pows[terms[i]]
     return inv_temp
 
-# derivative of steinhart-hart polynomial terms
-def sh_dp_dr(resistance, coefficients, terms):
-    df_dr = 0.0
-    for (c, p) in zip(coefficients, terms):
-        if p > 0:
-            df_dr += c * p * (np.log(resistance) ** (p - 1)) * (1.0 / resistance)
-    return df_dr
+# steinhart-hart polynomial terms and their derivative, sharing one log(resistance) evaluation
+def sh_p_and_dp(resistance, coefficients, terms):
+    # dispatch to a hand-unrolled kernel when one exists for this basis
+    fast = SH_SPECIALIZATIONS.get(tuple(terms))
+    if fast is not None:
+        return fast[1](resistance, coefficients)
+    # compute log(resistance) and its powers once
+    lnr_pows = sh_lnr_powers(resistance, terms)
+    inv_r = 1.0 / resistance
+    p = 0.0
+    dp_dr = 0.0
+    for i in range(len(terms)):
+        k = terms[i]
+        p += coefficients[i] * lnr_pows[k]
+        if k > 0:
+            dp_dr += coefficients[i] * k * lnr_pows[k - 1] * inv_r
+    return p, dp_dr
+
+# hand-unrolled kernels for the most common bases: no iteration over terms, and
+# repeated multiplication instead of ** calls. coefficients are expected in the
+# same order as the terms of the dispatch key
+def sh_p_01(resistance, coefficients):
+    return coefficients[0] + coefficients[1] * sh_log(resistance)
+
+def sh_p_and_dp_01(resistance, coefficients):
+    p = coefficients[0] + coefficients[1] * sh_log(resistance)
+    return p, coefficients[1] / resistance
+
+def sh_p_013(resistance, coefficients):
+    lnr = sh_log(resistance)
+    return coefficients[0] + coefficients[1] * lnr + coefficients[2] * lnr * lnr * lnr
+
+def sh_p_and_dp_013(resistance, coefficients):
+    lnr = sh_log(resistance)
+    lnr2 = lnr * lnr
+    p = coefficients[0] + coefficients[1] * lnr + coefficients[2] * lnr2 * lnr
+    dp_dr = (coefficients[1] + 3.0 * coefficients[2] * lnr2) / resistance
+    return p, dp_dr
+
+def sh_p_0123(resistance, coefficients):
+    lnr = sh_log(resistance)
+    lnr2 = lnr * lnr
+    return coefficients[0] + coefficients[1] * lnr + coefficients[2] * lnr2 + coefficients[3] * lnr2 * lnr
+
+def sh_p_and_dp_0123(resistance, coefficients):
+    lnr = sh_log(resistance)
+    lnr2 = lnr * lnr
+    p = coefficients[0] + coefficients[1] * lnr + coefficients[2] * lnr2 + coefficients[3] * lnr2 * lnr
+    dp_dr = (coefficients[1] + 2.0 * coefficients[2] * lnr + 3.0 * coefficients[3] * lnr2) / resistance
+    return p, dp_dr
+
+# dispatch table mapping a terms tuple to its (polynomial, polynomial + derivative) specialization
+SH_SPECIALIZATIONS = {
+    (0, 1): (sh_p_01, sh_p_and_dp_01),
+    (0, 1, 3): (sh_p_013, sh_p_and_dp_013),
+    (0, 1, 2, 3): (sh_p_0123, sh_p_and_dp_0123),
+}
 
 # general steinhart-hart equation
-def steinhart_hart(resistance, coefficients, terms = [0, 1, 3], temp_in_celsius=True):
-    # assert that number of coefficients and terms have the same length
-    assert len(coefficients) == len(terms), "Number of coefficients and terms must have the same length"
+def steinhart_hart(resistance, coefficients, terms = (0, 1, 3), temp_in_celsius=True):
     # calculate the temperature
     temp = 1.0 / sh_p(resistance, coefficients, terms)
     # return the temperature in celsius if requested
     return temp - 273.15 if temp_in_celsius else temp
 
 # first derivative of steinhart-hart equation
-def steinhart_hart_derivative(resistance, coefficients, terms = [0, 1, 3], temp_in_celsius=True):
-    # assert that number of coefficients and terms have the same length
-    assert len(coefficients) == len(terms), "Number of coefficients and terms must have the same length"
-    # calculate inner derivative
-    dp_dr = sh_dp_dr(resistance, coefficients, terms)
-    # polynomial terms
-    p = sh_p(resistance, coefficients, terms)
+def steinhart_hart_derivative(resistance, coefficients, terms = (0, 1, 3), temp_in_celsius=True):
+    # calculate polynomial terms and inner derivative in one pass
+    p, dp_dr = sh_p_and_dp(resistance, coefficients, terms)
     # return derivative
     return -dp_dr / (p ** 2)
 
+# closed-form inverse of the canonical three-term model a0 + a1*x + a3*x^3 = 1/T
+# (x = log(r)) via cardano's formula. returns None when the depressed cubic has
+# multiple real roots (discriminant <= 0), in which case the caller must fall
+# back to newton's method since the physical branch is ambiguous
+def inverse_steinhart_hart_013(temperatures, coefficients, terms, temp_in_celsius=True, min_resistance=1e-6):
+    # pick the coefficients of the constant, linear and cubic term
+    terms = tuple(terms)
+    a0 = coefficients[terms.index(0)]
+    a1 = coefficients[terms.index(1)]
+    a3 = coefficients[terms.index(3)]
+    if a3 == 0.0:
+        return None
+    # inverse temperatures (convert to kelvin)
+    inv_temp = 1.0 / (temperatures + 273.15 if temp_in_celsius else temperatures)
+    # depressed cubic x^3 + p*x + q = 0
+    p = a1 / a3
+    q = (a0 - inv_temp) / a3
+    # discriminant decides between one and three real roots
+    disc = (q / 2.0) ** 2 + (p / 3.0) ** 3
+    if np.any(disc <= 0.0):
+        return None
+    # single real root
+    s = np.sqrt(disc)
+    x = np.cbrt(-q / 2.0 + s) + np.cbrt(-q / 2.0 - s)
+    # return the resistance
+    return np.maximum(np.exp(x), min_resistance)
+
 # inverse steinhart-hart equation
 def inverse_steinhart_hart(
     temperature,
     coefficients,
-    terms = [0, 1, 3],
+    terms = (0, 1, 3),
     initial_guess = 1.0,
     temp_in_celsius=True,
     min_resistance = 1e-6,
     max_iterations = 500,
     tolerance = 1e-6
 ):
+    # normalize terms to an immutable, hashable tuple once per solve
+    terms = tuple(terms)
     # assert that number of coefficients and terms have the same length
     assert len(coefficients) == len(terms), "Number of coefficients and terms must have the same length"
+    # fast path: the canonical three-term model has a closed-form inverse
+    if sorted(terms) == [0, 1, 3]:
+        r = inverse_steinhart_hart_013(temperature, coefficients, terms, temp_in_celsius, min_resistance)
+        if r is not None:
+            return r
     # find numerical inverse of steinhart-hart equation using newton's method (f(r) = sh(r) - temperature)
-    r = initial_guess
-    for i in range(max_iterations):
-        # calculate f(r) and f'(r)
-        f = steinhart_hart(r, coefficients, terms, temp_in_celsius) - temperature
-        df_dr = steinhart_hart_derivative(r, coefficients, terms, temp_in_celsius)
-        # update r
-        r = max(r - f / df_dr, min_resistance)
-        # check for convergence
-        if np.abs(f) < tolerance:
-            break
-    # return the resistance
+    return newton_inverse_scalar(
+        float(temperature),
+        np.asarray(coefficients, dtype=np.float64),
+        terms,
+        float(initial_guess),
+        273.15 if temp_in_celsius else 0.0,
+        min_resistance,
+        max_iterations,
+        tolerance
+    )
+
+# vectorized inverse steinhart-hart equation (newton's method over a whole array of temperatures at once)
+def inverse_steinhart_hart_vec(
+    temperatures,
+    coefficients,
+    terms = (0, 1, 3),
+    initial_guess = 1.0,
+    temp_in_celsius=True,
+    min_resistance = 1e-6,
+    max_iterations = 500,
+    tolerance = 1e-6
+):
+    # normalize terms to an immutable, hashable tuple once per solve
+    terms = tuple(terms)
+    # assert that number of coefficients and terms have the same length
+    assert len(coefficients) == len(terms), "Number of coefficients and terms must have the same length"
+    # convert to numpy array if not already
+    if type(temperatures) is not np.ndarray:
+        temperatures = np.array(temperatures, dtype=np.float64)
+    # fast path: the canonical three-term model has a closed-form inverse
+    if sorted(terms) == [0, 1, 3]:
+        r = inverse_steinhart_hart_013(temperatures, coefficients, terms, temp_in_celsius, min_resistance)
+        if r is not None:
+            return r
+    # kelvin offset of the requested temperature scale
+    offset = 273.15 if temp_in_celsius else 0.0
+    # initial_guess may be a scalar or an array of per-temperature seeds (warm start)
+    r = np.full(temperatures.shape, initial_guess, dtype=np.float64)
+    # when numba is available, run one compiled scalar solve per lane in parallel
+    if NUMBA_AVAILABLE:
+        return newton_inverse_batch(
+            np.asarray(temperatures, dtype=np.float64),
+            np.asarray(coefficients, dtype=np.float64),
+            terms,
+            r,
+            offset,
+            min_resistance,
+            max_iterations,
+            tolerance
+        )
+    # numpy fallback: buffered newton's method on all lanes simultaneously, tiled
+    # into cache-sized blocks so the scratch buffers stay L2-resident on large sweeps
+    for start in range(0, temperatures.shape[0], NEWTON_BLOCK_SIZE):
+        block = slice(start, start + NEWTON_BLOCK_SIZE)
+        # the seed slice is a view and is refined in place
+        newton_inverse_buffered(temperatures[block], coefficients, terms, r[block], offset, min_resistance, max_iterations, tolerance)
+    # return the resistances
     return r
 
-# solve for N steinhart-hart coefficients given a set of temperature and resistance pairs
-def fit_steinhart_hart(temperature, resistance, powers, temp_in_celsius=True):
+# cached design matrix builder for repeated calibration sweeps over the same data.
+# keyed on the raw bytes of the log-resistance vector and the powers tuple, so fits
+# with identical inputs skip the centering and power-table rebuild entirely.
+# returns the design matrix and the centering offset mu of its basis
+@functools.lru_cache(maxsize=8)
+def sh_design_matrix(log_res_bytes, n, powers):
+    # reconstruct the log resistances from the cache key
+    log_res = np.frombuffer(log_res_bytes, dtype=np.float64, count=n)
+
+    # center the log resistances to improve the conditioning of the least squares system.
+    # shifting the basis mixes in all lower powers, so this is only valid when the
+    # requested powers form a contiguous range 0..max(powers)
+    contiguous = sorted(powers) == list(range(max(powers) + 1))
+    mu = log_res.mean() if contiguous else 0.0
+    centered = log_res - mu
+
+    # build all powers of the (centered) log resistances up to max(powers) by successive multiplication
+    cache = np.empty((max(powers) + 1, n))
+    cache[0] = 1.0
+    for k in range(1, max(powers) + 1):
+        cache[k] = cache[k - 1] * centered
+    # build the matrix from the requested columns
+    A = np.stack([cache[p] for p in powers], axis=1)
+    return A, mu
+
+# solve for N steinhart-hart coefficients given a set of temperature and resistance pairs.
+# the linearized fit minimizes error in 1/T space, which over-weights errors at high
+# temperatures; with relative=True the linear solution is refined by minimizing the
+# relative temperature residual (T_model - T) / T with levenberg-marquardt and an
+# analytic jacobian (requires scipy)
+def fit_steinhart_hart(temperature, resistance, powers, temp_in_celsius=True, relative=False):
     # assert that the number of temperature and resistance pairs is the same
     assert len(temperature) == len(resistance), "Number of temperature and resistance pairs must be the same"
     # assert that the number of pairs is at least N
@@ -72,6 +371,9 @@ def fit_steinhart_hart(temperature, resistance, powers, temp_in_celsius=True):
     # assert that the number of coefficients is at least 1
     assert len(powers) >= 1, "Number of coefficients must be at least 1"
 
+    # normalize powers to an immutable, hashable tuple once per fit
+    powers = tuple(powers)
+
     # convert to numpy arrays
     if type(temperature) is not np.ndarray:
         temperature = np.array(temperature)
@@ -84,14 +386,43 @@ def fit_steinhart_hart(temperature, resistance, powers, temp_in_celsius=True):
     # inverse temperatures (convert to kelvin)
     inv_temp = 1.0 / (temperature + 273.15 if temp_in_celsius else temperature)
 
-    # build the matrix
-    A = np.zeros((temperature.shape[0], len(powers)))
-    # polynomial terms
-    for i in range(len(powers)):
-        A[:, i] = log_res ** powers[i]
-    
-    # solve the system of equations in the least squares sense
-    x, _, _, _ = np.linalg.lstsq(A, inv_temp, rcond=None)
+    # (centered) design matrix, memoized across fits over the same data
+    A, mu = sh_design_matrix(log_res.tobytes(), log_res.shape[0], powers)
+
+    # solve the system of equations in the least squares sense; use the cheap normal
+    # equations when they are well conditioned, otherwise fall back to SVD
+    G = A.T @ A
+    if np.linalg.cond(G) < 1.0 / np.sqrt(np.finfo(np.float64).eps):
+        x = np.linalg.solve(G, A.T @ inv_temp)
+    else:
+        x, _, _, _ = np.linalg.lstsq(A, inv_temp, rcond=None)
+
+    # transform the coefficients from the centered basis (log_res - mu)**p back to the
+    # log_res**p basis by expanding the binomials
+    if mu != 0.0:
+        expanded = np.zeros(max(powers) + 1)
+        for (b, p) in zip(x, powers):
+            for k in range(p + 1):
+                expanded[k] += b * math.comb(p, k) * (-mu) ** (p - k)
+        x = np.array([expanded[p] for p in powers])
+
+    # optionally refine the linear solution by minimizing the relative temperature
+    # residual instead of the 1/T residual
+    if relative:
+        # scipy is only needed for this branch, so import it lazily
+        from scipy.optimize import least_squares
+        # absolute temperatures and the plain (uncentered) design matrix
+        temp_kelvin = 1.0 / inv_temp
+        L = A if mu == 0.0 else np.stack([log_res ** p for p in powers], axis=1)
+        # relative residual (T_model - T) / T with T_model = 1 / (L @ beta)
+        def residual(beta):
+            return (1.0 / (L @ beta) - temp_kelvin) / temp_kelvin
+        # analytic jacobian: dT_model/dbeta_k = -(log R)^k / p^2
+        def jacobian(beta):
+            p = L @ beta
+            return -L / (p ** 2 * temp_kelvin)[:, np.newaxis]
+        # levenberg-marquardt, seeded with the linear solution
+        x = least_squares(residual, x, jac=jacobian, method='lm').x
 
     # return the coefficients
     return x
\ No newline at end of file